@@ -1,18 +1,50 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from tkinter.scrolledtext import ScrolledText
-import yfinance as yf
-import pandas as pd
+import numpy as np
+import collections
 import json
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from tools.cache import FileCache
+from utils._njit import _macd_panel
+
+try:
+    import talib
+except ImportError:
+    talib = None
+
+# yfinance and pandas add seconds of import time; they are loaded lazily by
+# the background threads that use them so the window appears immediately.
+yf = None
+pd = None
+
+
+def _lazy_imports():
+    """Bind the yfinance and pandas modules on first use."""
+    global yf, pd
+    if yf is None:
+        import yfinance
+        import pandas
+        yf = yfinance
+        pd = pandas
+
 # Constants
 JSON_FILE = 'stocks.json'
 DEFAULT_STOCKS = ["AAPL", "MSFT", "NVDA", "TSLA"]
 UPDATE_INTERVAL = 60  # in seconds
+VALIDATION_TTL = 300  # seconds to remember whether a symbol is valid
+LOG_FLUSH_MS = 100  # how often queued log messages are flushed to the widget
+BAR_INTERVAL = "1m"
+BAR_CACHE_MAX_AGE = 24 * 3600  # cached bars older than this are refetched in full
+# EWMA smoothing factors, 2 / (span + 1) for the 12/26/9 MACD spans
+A12 = 2.0 / 13.0
+A26 = 2.0 / 27.0
+A9 = 2.0 / 10.0
 
 class StockApp:
     def __init__(self, root):
@@ -21,7 +53,18 @@ class StockApp:
         self.root.geometry("800x600")
         self.root.resizable(False, False)
         self.stocks = self.load_stocks()
+        self._saved_hash = hash(tuple(self.stocks))  # What stocks.json currently holds
         self.is_running = False  # To control the start and stop of updates
+        self._stop_evt = threading.Event()  # Set to cancel the update thread's wait
+        self._ticker_cache = {}  # symbol -> yf.Ticker, built lazily
+        self._validation_cache = {}  # symbol -> (is_valid, expires_at)
+        self._bar_cache = FileCache()
+        self._pool = ThreadPoolExecutor(max_workers=8)
+        self._item_to_symbol = {}  # Treeview item id -> symbol, kept in sync on add/remove
+        self._log_queue = collections.deque()
+        self._log_lock = threading.Lock()
+        self._log_flush_pending = False
+        self._last_values = {}  # Treeview item id -> last values written, for diffing
         self.create_gui()
         self.populate_initial_stocks()
 
@@ -44,10 +87,18 @@ class StockApp:
             return DEFAULT_STOCKS.copy()
 
     def save_stocks(self):
-        """Save the current stock list to JSON file."""
+        """Save the current stock list to JSON file, skipping no-op saves."""
+        current = hash(tuple(self.stocks))
+        if current == self._saved_hash:
+            return
         try:
-            with open(JSON_FILE, 'w') as f:
+            # Write to a temp file and swap it in so the list is never
+            # left half-written on disk.
+            tmp_file = JSON_FILE + '.tmp'
+            with open(tmp_file, 'w') as f:
                 json.dump(self.stocks, f, indent=4)
+            os.replace(tmp_file, JSON_FILE)
+            self._saved_hash = current
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save JSON file: {e}")
 
@@ -73,6 +124,7 @@ class StockApp:
 
         # Create Treeview
         columns = ("Symbol", "Price", "Signal", "OSMA", "Action")
+        self.columns = columns
         self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings', height=10)
         for col in columns:
             self.tree.heading(col, text=col)
@@ -116,7 +168,32 @@ class StockApp:
     def populate_initial_stocks(self):
         """Insert initial stocks into the Treeview with default values."""
         for symbol in self.stocks:
-            self.tree.insert("", tk.END, values=(symbol, "Loading...", "Loading...", "Loading...", ""))
+            item = self.tree.insert("", tk.END, values=(symbol, "Loading...", "Loading...", "Loading...", ""))
+            self._item_to_symbol[item] = symbol
+
+    def _ticker(self, symbol):
+        """Return a cached yf.Ticker for the symbol, creating it once."""
+        ticker = self._ticker_cache.get(symbol)
+        if ticker is None:
+            ticker = yf.Ticker(symbol)
+            self._ticker_cache[symbol] = ticker
+        return ticker
+
+    def _validate_symbol(self, symbol):
+        """Check that a symbol has data, caching the result for a short TTL."""
+        cached = self._validation_cache.get(symbol)
+        if cached is not None and cached[1] > time.time():
+            return cached[0]
+        ticker = self._ticker(symbol)
+        try:
+            # fast_info is one small request, unlike .info or a full
+            # intraday history pull.
+            is_valid = ticker.fast_info['last_price'] is not None
+        except Exception:
+            # Unusual symbols or older yfinance: fall back to a 1-bar probe.
+            is_valid = not ticker.history(period="1d").empty
+        self._validation_cache[symbol] = (is_valid, time.time() + VALIDATION_TTL)
+        return is_valid
 
     def add_stock(self):
         """Add a new stock symbol."""
@@ -126,22 +203,32 @@ class StockApp:
             if symbol in self.stocks:
                 messagebox.showinfo("Info", f"{symbol} is already being tracked.")
                 return
-            # Validate the symbol by attempting to fetch recent historical data
-            try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period="1d", interval="1m")
-                if hist.empty:
-                    raise ValueError("Invalid stock symbol or no data available.")
-                # If validation passes, add the stock
-                self.stocks.append(symbol)
-                self.save_stocks()
-                self.tree.insert("", tk.END, values=(symbol, "Loading...", "Loading...", "Loading...", ""))
-                self.stop_updates()
-                self.start_updates()
-                # self.log_action(f"Added stock {symbol}", tag='info')
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to add stock {symbol}: {e}")
-                self.log_action(f"Failed to add stock {symbol}: {e}", tag='error')
+            # Validate on a pool thread so the GUI stays responsive.
+            self._pool.submit(self._validate_and_add, symbol)
+
+    def _validate_and_add(self, symbol):
+        """Validate a symbol off the Tk thread, then finish the add on it."""
+        _lazy_imports()
+        try:
+            if not self._validate_symbol(symbol):
+                raise ValueError("Invalid stock symbol or no data available.")
+        except Exception as e:
+            message = f"Failed to add stock {symbol}: {e}"
+            self.root.after(0, lambda: (messagebox.showerror("Error", message),
+                                        self.log_action(message)))
+            return
+        self.root.after(0, self._finish_add, symbol)
+
+    def _finish_add(self, symbol):
+        """Insert a validated symbol into the list and Treeview."""
+        if symbol in self.stocks:
+            return
+        self.stocks.append(symbol)
+        self.save_stocks()
+        item = self.tree.insert("", tk.END, values=(symbol, "Loading...", "Loading...", "Loading...", ""))
+        self._item_to_symbol[item] = symbol
+        self.stop_updates()
+        self.start_updates()
 
 
     def remove_stock(self):
@@ -151,7 +238,8 @@ class StockApp:
             messagebox.showinfo("Info", "No stock selected.")
             return
         for item in selected_items:
-            symbol = self.tree.item(item, 'values')[0]
+            symbol = self._item_to_symbol.pop(item)
+            self._last_values.pop(item, None)
             self.stocks.remove(symbol)
             self.tree.delete(item)
             self.log_action(f"Removed stock {symbol}")
@@ -161,6 +249,7 @@ class StockApp:
         """Start the periodic data updates."""
         if not self.is_running:
             self.is_running = True
+            self._stop_evt.clear()
             self.log_action("Started data updates.")
             self.update_data()
 
@@ -168,72 +257,207 @@ class StockApp:
         """Stop the periodic data updates."""
         if self.is_running:
             self.is_running = False
+            self._stop_evt.set()
             self.log_action("Stopped data updates.")
 
     def update_data(self):
         """Fetch and update stock data."""
         def task():
+            _lazy_imports()
+            # Kernel output buffers, local to this thread: restart spawns a
+            # fresh update thread, and a superseded one mid-cycle must not
+            # share scratch arrays with its replacement. Reallocated only
+            # when the panel shape changes.
+            buf_signal = buf_osma = None
             while self.is_running:
-                for item in self.tree.get_children():
-                    symbol = self.tree.item(item, 'values')[0]
+                # Snapshot the rows once per cycle: no Tk bridge crossings
+                # from this thread, and add/remove mid-cycle can't race the
+                # iteration below.
+                rows = tuple(self._item_to_symbol.items())
+                symbols = [symbol for _, symbol in rows]
+                if not symbols:
+                    # Empty watchlist: nothing to download this cycle.
+                    if self._stop_evt.wait(UPDATE_INTERVAL):
+                        break
+                    continue
+                # Fetch history for all symbols in a single batched request
+                # instead of one round-trip per symbol.
+                cached = {symbol: self._bar_cache.load(symbol, BAR_INTERVAL,
+                                                       BAR_CACHE_MAX_AGE)
+                          for symbol in symbols}
+                try:
+                    if cached and all(frame is not None for frame in cached.values()):
+                        # Every symbol has recent bars on disk: only request
+                        # the window since the oldest cached tail.
+                        start = min(frame.index[-1] for frame in cached.values())
+                        data = yf.download(tickers=" ".join(symbols), start=start,
+                                           interval=BAR_INTERVAL, group_by="ticker",
+                                           threads=True, progress=False)
+                    else:
+                        data = yf.download(tickers=" ".join(symbols), period="1d",
+                                           interval=BAR_INTERVAL, group_by="ticker",
+                                           threads=True, progress=False)
+                except Exception as e:
+                    self.log_action(f"Error downloading data: {e}")
+                    data = None
+                # Merge the per-symbol frames and collect the close columns.
+                closes = {}
+                for symbol in symbols:
                     try:
-                        ticker = yf.Ticker(symbol)
-                        # Fetch historical data for indicators
-                        hist = ticker.history(period="1d", interval="1m")
+                        if data is None:
+                            raise ValueError("Download failed.")
+                        # Modern yfinance returns MultiIndex columns even for
+                        # a single ticker, so pick the slice by frame shape.
+                        hist = (data[symbol]
+                                if isinstance(data.columns, pd.MultiIndex)
+                                else data)
+                        hist = hist.dropna(subset=["Close"])
+                        prev = cached.get(symbol)
+                        if prev is not None:
+                            hist = pd.concat([prev, hist])
+                            hist = hist[~hist.index.duplicated(keep='last')]
+                            # Keep the frame bounded to the indicator window.
+                            hist = hist[hist.index >= hist.index[-1] - pd.Timedelta(days=1)]
                         if hist.empty:
                             raise ValueError("No historical data available.")
-                        # Compute MACD
-                        macd, signal, osma = self.compute_macd(hist)
-                        # Get current price
-                        current_price = hist['Close'][-1]
-                        # Determine buy/sell signals
-                        if len(osma) < 2 or len(signal) < 2:
-                            action = ""
-                        else:
-                            if osma.iloc[-1] > signal.iloc[-1] and osma.iloc[-2] <= signal.iloc[-2]:
-                                action = "BUY"
-                                self.log_action(f"BUY signal for {symbol} at ${current_price:.2f}")
-                            elif osma.iloc[-1] < signal.iloc[-1] and osma.iloc[-2] >= signal.iloc[-2]:
-                                action = "SELL"
-                                self.log_action(f"SELL signal for {symbol} at ${current_price:.2f}")
-                            else:
-                                action = ""
-                        # Update the treeview
-                        self.root.after(0, lambda item=item, symbol=symbol, price=current_price,
-                                       sig=signal.iloc[-1], osma_val=osma.iloc[-1], action=action:
-                                       self.tree.item(item, values=(
-                                           symbol,
-                                           f"{price:.2f}",
-                                           f"{sig:.4f}",
-                                           f"{osma_val:.4f}",
-                                           action
-                                       )))
+                        # Persist on a pool thread; the cycle doesn't need
+                        # to wait on per-symbol disk writes.
+                        self._pool.submit(self._bar_cache.store, symbol,
+                                          BAR_INTERVAL, hist)
+                        closes[symbol] = hist['Close']
                     except Exception as e:
-                        self.root.after(0, lambda item=item: self.tree.item(item, values=(self.tree.item(item, 'values')[0], "Error", "Error", "Error", "")))
                         self.log_action(f"Error updating {symbol}: {e}")
-                # Wait for the next update
-                for _ in range(UPDATE_INTERVAL):
-                    if not self.is_running:
-                        break
-                    time.sleep(1)
+                # Compute MACD for all symbols at once on a wide frame
+                # (columns = symbols); ewm is vectorized across columns.
+                if closes:
+                    closes_frame = pd.DataFrame(closes).ffill()
+                    panel_symbols = list(closes_frame.columns)
+                    col = {symbol: j for j, symbol in enumerate(panel_symbols)}
+                    # float32 halves the bandwidth through the panel and is
+                    # plenty for 4-7 significant digits of price data.
+                    closes_np = closes_frame.to_numpy(dtype=np.float32)
+                    if (buf_signal is None
+                            or buf_signal.shape != closes_np.shape
+                            or buf_signal.dtype != closes_np.dtype):
+                        buf_signal = np.empty_like(closes_np)
+                        buf_osma = np.empty_like(closes_np)
+                    sig_t, sig_tm1, osma_t, osma_tm1 = self.compute_macd_tail(
+                        closes_np, buf_signal, buf_osma)
+                    last_price = closes_np[-1]
+                    # Crossover detection as two vector compares; the branchy
+                    # logging path below only visits symbols that fired.
+                    buy_mask = (osma_t > sig_t) & (osma_tm1 <= sig_tm1)
+                    sell_mask = (osma_t < sig_t) & (osma_tm1 >= sig_tm1)
+                    for j in np.flatnonzero(buy_mask | sell_mask):
+                        fired = "BUY" if buy_mask[j] else "SELL"
+                        self.log_action(f"{fired} signal for {panel_symbols[j]} "
+                                        f"at ${last_price[j]:.2f}")
+                # Collect row updates and post them to Tk as one callback
+                # instead of one event per symbol.
+                updates = []
+                for item, symbol in rows:
+                    if symbol not in closes:
+                        updates.append((item, (symbol, "Error", "Error", "Error", "")))
+                        continue
+                    j = col[symbol]
+                    action = "BUY" if buy_mask[j] else ("SELL" if sell_mask[j] else "")
+                    updates.append((item, (
+                        symbol,
+                        f"{last_price[j]:.2f}",
+                        f"{sig_t[j]:.4f}",
+                        f"{osma_t[j]:.4f}",
+                        action
+                    )))
+                if updates:
+                    self.root.after(0, self._apply_updates, updates)
+                # Wait for the next update; returns True immediately on Stop.
+                if self._stop_evt.wait(UPDATE_INTERVAL):
+                    break
         threading.Thread(target=task, daemon=True).start()
 
-    def compute_macd(self, hist):
-        """Compute MACD, Signal, and OSMA."""
-        close = hist['Close']
-        ema12 = close.ewm(span=12, adjust=False).mean()
-        ema26 = close.ewm(span=26, adjust=False).mean()
-        macd = ema12 - ema26
-        signal = macd.ewm(span=9, adjust=False).mean()
-        osma = macd - signal
-        return macd, signal, osma
+    def _apply_updates(self, updates):
+        """Apply a batch of (item, values) row updates on the Tk main thread.
+
+        Diffs against the last values written per row and only pushes the
+        cells that actually changed through tree.set, instead of rewriting
+        whole rows every tick.
+        """
+        for item, values in updates:
+            if not self.tree.exists(item):
+                continue
+            old = self._last_values.get(item)
+            if old == values:
+                continue
+            if old is None:
+                self.tree.item(item, values=values)
+            else:
+                for column, old_val, new_val in zip(self.columns, old, values):
+                    if old_val != new_val:
+                        self.tree.set(item, column, new_val)
+            self._last_values[item] = values
+
+    def compute_macd_tail(self, closes_np, buf_signal, buf_osma):
+        """Compute the trailing Signal/OSMA values used for crossover checks.
+
+        Takes a (time x symbols) float array plus caller-owned kernel
+        scratch buffers of the same shape and dtype, and returns
+        (sig_t, sig_tm1, osma_t, osma_tm1) as arrays over symbols. The
+        EWMA recursions (alpha = 2/(span+1), matching ewm(adjust=False))
+        need the full history for correctness, but everything stays on
+        ndarrays and only the last two rows leave this function.
+
+        Uses the talib C implementation when it is installed; its MACD
+        histogram is exactly the OSMA computed here.
+        """
+        if talib is not None and len(closes_np) >= 2:
+            n_symbols = closes_np.shape[1]
+            signal = np.empty((2, n_symbols))
+            osma = np.empty((2, n_symbols))
+            for j in range(n_symbols):
+                # talib only accepts float64 input.
+                _, sig_col, hist_col = talib.MACD(
+                    np.ascontiguousarray(closes_np[:, j], dtype=np.float64),
+                    fastperiod=12, slowperiod=26, signalperiod=9)
+                signal[:, j] = sig_col[-2:]
+                osma[:, j] = hist_col[-2:]
+            # talib leaves the first slowperiod + signalperiod - 2 bars as
+            # NaN; on short histories fall through to the kernel, which
+            # produces values from the first bar like ewm(adjust=False).
+            if not np.isnan(signal).any() and not np.isnan(osma).any():
+                return signal[-1], signal[-2], osma[-1], osma[-2]
+        signal, osma = buf_signal, buf_osma
+        _macd_panel(closes_np, A12, A26, A9, signal, osma)
+        if len(closes_np) < 2:
+            # A single bar can never satisfy a crossover condition.
+            return signal[-1], signal[-1], osma[-1], osma[-1]
+        return signal[-1], signal[-2], osma[-1], osma[-2]
 
     def log_action(self, message):
-        """Log an action with timestamp in the log window."""
+        """Queue a timestamped message for the log window.
+
+        Messages are buffered and flushed in one batch every LOG_FLUSH_MS
+        so bursts of signals don't stall the GUI thread with per-message
+        widget calls. Safe to call from any thread.
+        """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"[{timestamp}] {message}\n"
+        self._log_queue.append(f"[{timestamp}] {message}\n")
+        with self._log_lock:
+            if self._log_flush_pending:
+                return
+            self._log_flush_pending = True
+        self.root.after(LOG_FLUSH_MS, self._flush_log)
+
+    def _flush_log(self):
+        """Drain queued log messages into the widget with a single insert."""
+        with self._log_lock:
+            self._log_flush_pending = False
+        messages = []
+        while self._log_queue:
+            messages.append(self._log_queue.popleft())
+        if not messages:
+            return
         self.log_text.configure(state='normal')
-        self.log_text.insert(tk.END, log_message)
+        self.log_text.insert(tk.END, ''.join(messages))
         self.log_text.configure(state='disabled')
         self.log_text.see(tk.END)  # Auto-scroll to the end
 
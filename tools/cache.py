@@ -0,0 +1,59 @@
+import os
+import pickle
+import time
+
+CACHE_DIR = '.cache'
+
+
+class FileCache:
+    """Pickle-backed cache of per-symbol price history frames.
+
+    Entries are keyed by (symbol, interval) and stored one file each under
+    the cache directory, together with the time they were fetched so stale
+    entries can be invalidated on load.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, symbol, interval):
+        return os.path.join(self.cache_dir, f"{symbol}_{interval}.pkl")
+
+    def load(self, symbol, interval, max_age):
+        """Return the cached frame, or None if missing, stale, or unreadable.
+
+        Unreadable entries (truncated writes, payloads pickled by an
+        incompatible pandas, wrong payload shape) are deleted so they
+        can't fail again on the next cycle or restart.
+        """
+        path = self._path(symbol, interval)
+        try:
+            with open(path, 'rb') as f:
+                fetched_at, frame = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        if time.time() - fetched_at > max_age:
+            return None
+        return frame
+
+    def store(self, symbol, interval, frame):
+        """Persist the frame for the symbol, replacing any previous entry.
+
+        Writes to a temp file and swaps it in so an interrupted write
+        never leaves a truncated entry behind.
+        """
+        path = self._path(symbol, interval)
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((time.time(), frame), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
@@ -0,0 +1,57 @@
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+    prange = range
+
+
+@njit(parallel=True, cache=True,
+      fastmath={'reassoc', 'nsz', 'contract', 'arcp'})
+def _macd_panel(closes, a12, a26, a9, signal, osma):
+    """Signal and OSMA over a (time x symbols) panel of closes in one pass.
+
+    Each alpha is 2 / (span + 1), matching ewm(span, adjust=False).
+    Results are written into the caller-owned signal/osma buffers (same
+    shape and dtype as closes) so steady-state cycles allocate nothing.
+    The columns are independent recursions, so the outer loop runs in
+    parallel via prange; all three EWMAs advance together without
+    intermediate full-length arrays. Reassociation-only fastmath flags
+    keep the affine recurrence fast while preserving NaN semantics for
+    the leading-gap scan.
+
+    Columns whose history starts after the panel's first row (newly
+    added symbols, union-index gaps) carry leading NaNs that ffill
+    cannot touch; each recursion is seeded at its column's first finite
+    bar, matching how pandas ewm skips leading NaNs.
+    """
+    T, N = closes.shape
+    for j in prange(N):
+        start = 0
+        while start < T and np.isnan(closes[start, j]):
+            signal[start, j] = np.nan
+            osma[start, j] = np.nan
+            start += 1
+        if start == T:
+            continue
+        ema12 = closes[start, j]
+        ema26 = closes[start, j]
+        sig = 0.0  # macd starts at 0, so signal and osma do too
+        signal[start, j] = sig
+        osma[start, j] = sig
+        for i in range(start + 1, T):
+            ema12 = a12 * closes[i, j] + (1.0 - a12) * ema12
+            ema26 = a26 * closes[i, j] + (1.0 - a26) * ema26
+            macd = ema12 - ema26
+            sig = a9 * macd + (1.0 - a9) * sig
+            signal[i, j] = sig
+            osma[i, j] = macd - sig